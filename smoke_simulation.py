@@ -1,6 +1,19 @@
 import pygame
-import random
 import math
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        def wrap(fn):
+            return fn
+        return wrap
+
+    prange = range
 
 WIDTH, HEIGHT = 1000, 700
 FPS = 60
@@ -13,6 +26,18 @@ SLIDER_COLOR = (100, 100, 100)
 KNOB_COLOR = (200, 200, 200)
 OBSTACLE_COLOR = (100, 100, 150)
 
+ALPHA_STEP = 16
+ALPHA_BUCKETS = 256 // ALPHA_STEP
+MIN_VISIBLE_LIFE = 5.0
+THROTTLE_FRAME_MS = 20
+OVERLAY_REFRESH_FRAMES = 4
+GRID_CELL_SNAP = 8
+FIELD_STEP = 10
+MAX_PARTICLES = 200
+
+EULER, MIDPOINT, RK4 = range(3)
+INTEGRATOR_NAMES = ("Euler", "Midpoint", "RK4")
+
 class SimulationParams:
     def __init__(self):
         self.gravity = 0.05
@@ -27,7 +52,7 @@ class SimulationParams:
         self.turbulence_strength = 0.5
         
         self.noise_scale = 0.005
-        self.use_rk4 = True
+        self.integrator = RK4
         self.time = 0
 
         self.smoothing_radius = 30.0
@@ -37,57 +62,72 @@ class SimulationParams:
 
 params = SimulationParams()
 
+def snap_cell_size(smoothing_radius):
+    # round up so a 3x3 cell search still covers the whole smoothing radius
+    return float(math.ceil(smoothing_radius / GRID_CELL_SNAP) * GRID_CELL_SNAP)
+
 class FixedGrid:
     def __init__(self, width, height, cell_size):
         self.width = width
         self.height = height
+        self.resize(cell_size)
+
+    def resize(self, cell_size):
         self.cell_size = cell_size
-        self.cols = math.ceil(width / cell_size)
-        self.rows = math.ceil(height / cell_size)
-        self.cells = [[[] for _ in range(self.cols)] for _ in range(self.rows)]
-
-    def clear(self):
-        for r in range(self.rows):
-            for c in range(self.cols):
-                self.cells[r][c].clear()
-
-    def insert(self, particle):
-        cx = int(particle.x / self.cell_size)
-        cy = int(particle.y / self.cell_size)
-        
-        if 0 <= cx < self.cols and 0 <= cy < self.rows:
-            self.cells[cy][cx].append(particle)
+        self.cols = math.ceil(self.width / cell_size)
+        self.rows = math.ceil(self.height / cell_size)
+        self.cell_start = np.zeros(self.rows * self.cols + 1, dtype=np.int32)
+        self.particle_ids = np.zeros(0, dtype=np.int32)
 
-    def query(self, x, y, radius):
+        size = math.ceil(cell_size)
+        self.cell_overlay = pygame.Surface((size, size), pygame.SRCALPHA)
+        self.cell_overlay.fill((0, 255, 0, 30))
+
+        # serpentine paths so each axis is one draw.lines call; the joins run along the borders
+        self.v_lines = []
+        for c in range(self.cols + 1):
+            ends = [(c * cell_size, 0), (c * cell_size, self.height)]
+            self.v_lines.extend(ends if c % 2 == 0 else ends[::-1])
+        self.h_lines = []
+        for r in range(self.rows + 1):
+            ends = [(0, r * cell_size), (self.width, r * cell_size)]
+            self.h_lines.extend(ends if r % 2 == 0 else ends[::-1])
+
+    def build(self, xs, ys):
+        cx = (xs / self.cell_size).astype(np.intp)
+        cy = (ys / self.cell_size).astype(np.intp)
+
+        ids = np.flatnonzero((cx >= 0) & (cx < self.cols) & (cy >= 0) & (cy < self.rows))
+        cells = cy[ids] * self.cols + cx[ids]
+
+        counts = np.bincount(cells, minlength=self.rows * self.cols)
+        np.cumsum(counts, out=self.cell_start[1:])
+        self.particle_ids = ids[np.argsort(cells, kind="stable")].astype(np.int32)
+
+    def query(self, x, y, radius, xs, ys):
         particles = []
         cx = int(x / self.cell_size)
         cy = int(y / self.cell_size)
         
-        for r in range(cy - 1, cy + 2):
-            for c in range(cx - 1, cx + 2):
-                if 0 <= r < self.rows and 0 <= c < self.cols:
-                    for p in self.cells[r][c]:
-                        dx = p.x - x
-                        dy = p.y - y
-                        if dx*dx + dy*dy <= radius*radius:
-                            particles.append(p)
+        for r in range(max(cy - 1, 0), min(cy + 2, self.rows)):
+            for c in range(max(cx - 1, 0), min(cx + 2, self.cols)):
+                cell = r * self.cols + c
+                for i in self.particle_ids[self.cell_start[cell]:self.cell_start[cell + 1]].tolist():
+                    dx = xs[i] - x
+                    dy = ys[i] - y
+                    if dx*dx + dy*dy <= radius*radius:
+                        particles.append(i)
         return particles
 
     def draw_grid(self, surface):
-        for c in range(self.cols + 1):
-            x = c * self.cell_size
-            pygame.draw.line(surface, (50, 50, 50), (x, 0), (x, self.height))
-        for r in range(self.rows + 1):
-            y = r * self.cell_size
-            pygame.draw.line(surface, (50, 50, 50), (0, y), (self.width, y))
-        
-        for r in range(self.rows):
-            for c in range(self.cols):
-                if self.cells[r][c]:
-                    rect = (c * self.cell_size, r * self.cell_size, self.cell_size, self.cell_size)
-                    s = pygame.Surface((self.cell_size, self.cell_size), pygame.SRCALPHA)
-                    s.fill((0, 255, 0, 30))
-                    surface.blit(s, rect)
+        pygame.draw.lines(surface, (50, 50, 50), False, self.v_lines)
+        pygame.draw.lines(surface, (50, 50, 50), False, self.h_lines)
+
+        occupied = np.flatnonzero(np.diff(self.cell_start))
+        rows, cols = np.divmod(occupied, self.cols)
+        xs = (cols * self.cell_size).astype(np.intp).tolist()
+        ys = (rows * self.cell_size).astype(np.intp).tolist()
+        surface.blits([(self.cell_overlay, pos) for pos in zip(xs, ys)], doreturn=False)
 
 class VectorGrid:
     def __init__(self, rows, cols, width, height):
@@ -97,59 +137,87 @@ class VectorGrid:
         self.height = height
         self.cell_w = width // cols
         self.cell_h = height // rows
-        self.vectors = [[(0, 0) for _ in range(cols)] for _ in range(rows)]
+
+        cx = ((np.arange(cols) + 0.5) * self.cell_w).astype(np.float32)
+        cy = ((np.arange(rows) + 0.5) * self.cell_h).astype(np.float32)
+        self.cx = cx[None, :]
+        self.cy = cy[:, None]
+
+        X, Y = np.meshgrid(cx, cy)
+        self.centers = np.stack((X.ravel(), Y.ravel()), axis=1)
+
+        self.vx = np.zeros((rows, cols), dtype=np.float32)
+        self.vy = np.zeros((rows, cols), dtype=np.float32)
+
+        # particles sample a finer copy of the field; the coarse grid above is only drawn
+        self.field_cols = math.ceil(width / FIELD_STEP)
+        self.field_rows = math.ceil(height / FIELD_STEP)
+        self.inv_field_step = 1.0 / FIELD_STEP
+        self.field_x = ((np.arange(self.field_cols) + 0.5) * FIELD_STEP).astype(np.float32)[None, :]
+        self.field_y = ((np.arange(self.field_rows) + 0.5) * FIELD_STEP).astype(np.float32)[:, None]
+        self.field_vx = np.zeros((self.field_rows, self.field_cols), dtype=np.float32)
+        self.field_vy = np.zeros((self.field_rows, self.field_cols), dtype=np.float32)
+
+        self.overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+        self.overlay_age = OVERLAY_REFRESH_FRAMES
     
-    def get_potential(self, x, y, time):
-        val = 0
-        scale = params.noise_scale
-        
-        val += math.sin(x * scale + time) + math.cos(y * scale + time)
-        val += 0.5 * (math.sin(x * scale * 2.0 + time * 1.5) + math.cos(y * scale * 2.0 + time * 1.5))
-        val += 0.25 * (math.sin(x * scale * 4.0 + time * 2.0) + math.cos(y * scale * 4.0 + time * 2.0))
-        
-        return val
+    def compute_curl(self, x, y):
+        s1, s2, s4 = self.scales
+        t1, t15, t2 = self.phases
 
-    def compute_curl(self, x, y, time):
-        epsilon = 1.0 
-        
-        n_up = self.get_potential(x, y - epsilon, time)
-        n_down = self.get_potential(x, y + epsilon, time)
-        dy = (n_down - n_up) / (2 * epsilon)
-        
-        n_left = self.get_potential(x - epsilon, y, time)
-        n_right = self.get_potential(x + epsilon, y, time)
-        dx = (n_right - n_left) / (2 * epsilon)
-        
-        return dy, -dx
+        dp_dx = s1 * (np.cos(x * s1 + t1) + np.cos(x * s2 + t15) + np.cos(x * s4 + t2))
+        dp_dy = -s1 * (np.sin(y * s1 + t1) + np.sin(y * s2 + t15) + np.sin(y * s4 + t2))
+
+        return dp_dy, -dp_dx
 
     def update(self, time):
-        for r in range(self.rows):
-            for c in range(self.cols):
-                cx = c * self.cell_w + self.cell_w // 2
-                cy = r * self.cell_h + self.cell_h // 2
-                
-                vx, vy = self.compute_curl(cx, cy, time)
-                
-                self.vectors[r][c] = (vx, vy)
-
-    def get_force(self, x, y, time=None):
-        if time is None: time = params.time
-        return self.compute_curl(x, y, time)
+        scale = params.noise_scale
+        self.scales = (scale, scale * 2.0, scale * 4.0)
+        self.phases = (time, time * 1.5, time * 2.0)
+
+        vx, vy = self.compute_curl(self.cx, self.cy)
+        self.vx[:] = vx
+        self.vy[:] = vy
+
+        vx, vy = self.compute_curl(self.field_x, self.field_y)
+        self.field_vx[:] = vx
+        self.field_vy[:] = vy
+
+    def get_forces(self, xs, ys):
+        gx = np.clip(xs * self.inv_field_step - 0.5, 0, self.field_cols - 1)
+        gy = np.clip(ys * self.inv_field_step - 0.5, 0, self.field_rows - 1)
+        c = np.minimum(gx.astype(np.intp), self.field_cols - 2)
+        r = np.minimum(gy.astype(np.intp), self.field_rows - 2)
+        tx = gx - c.astype(np.float32)
+        ty = gy - r.astype(np.float32)
+        return self.bilerp(self.field_vx, r, c, tx, ty), self.bilerp(self.field_vy, r, c, tx, ty)
+
+    def bilerp(self, field, r, c, tx, ty):
+        top = field[r, c] + (field[r, c + 1] - field[r, c]) * tx
+        bottom = field[r + 1, c] + (field[r + 1, c + 1] - field[r + 1, c]) * tx
+        return top + (bottom - top) * ty
 
     def draw(self, surface):
-        for r in range(self.rows):
-            for c in range(self.cols):
-                cx = c * self.cell_w + self.cell_w // 2
-                cy = r * self.cell_h + self.cell_h // 2
-                vx, vy = self.vectors[r][c]
-                
-                vis_scale = 600.0
-                end_x = cx + vx * vis_scale
-                end_y = cy + vy * vis_scale
-                
-                color = (80, 80, 80)
-                pygame.draw.line(surface, color, (cx, cy), (end_x, end_y), 1)
-                pygame.draw.circle(surface, (100, 100, 100), (cx, cy), 2)
+        if self.overlay_age >= OVERLAY_REFRESH_FRAMES:
+            self.render_overlay()
+            self.overlay_age = 0
+        self.overlay_age += 1
+
+        surface.blit(self.overlay, (0, 0))
+
+    def render_overlay(self):
+        self.overlay.fill((0, 0, 0, 0))
+
+        vis_scale = 600.0
+        segments = np.empty((self.rows * self.cols, 2, 2), dtype=np.float32)
+        segments[:, 0] = self.centers
+        segments[:, 1, 0] = self.centers[:, 0] + self.vx.ravel() * vis_scale
+        segments[:, 1, 1] = self.centers[:, 1] + self.vy.ravel() * vis_scale
+
+        color = (80, 80, 80)
+        for start, end in segments.tolist():
+            pygame.draw.line(self.overlay, color, start, end, 1)
+            pygame.draw.circle(self.overlay, (100, 100, 100), start, 2)
 
 class Slider:
     def __init__(self, x, y, w, h, min_val, max_val, initial_val, label):
@@ -159,10 +227,15 @@ class Slider:
         self.val = initial_val
         self.label = label
         self.dragging = False
+        self.label_text = None
+        self.label_surf = None
+
+    def contains(self, pos):
+        return self.rect.collidepoint(pos)
         
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN:
-            if self.rect.collidepoint(event.pos):
+            if self.contains(event.pos):
                 self.dragging = True
                 self.update_val(event.pos[0])
         elif event.type == pygame.MOUSEBUTTONUP:
@@ -177,33 +250,45 @@ class Slider:
         self.val = self.min_val + (self.max_val - self.min_val) * ratio
 
     def draw(self, surface, font):
-        label_surf = font.render(f"{self.label}: {self.val:.3f}", True, TEXT_COLOR)
-        surface.blit(label_surf, (self.rect.x, self.rect.y - 25))
+        label_text = f"{self.label}: {self.val:.3f}"
+        if label_text != self.label_text:
+            self.label_text = label_text
+            self.label_surf = font.render(label_text, True, TEXT_COLOR)
+        surface.blit(self.label_surf, (self.rect.x, self.rect.y - 25))
         pygame.draw.rect(surface, SLIDER_COLOR, self.rect)
         ratio = (self.val - self.min_val) / (self.max_val - self.min_val)
         knob_x = self.rect.x + self.rect.width * ratio
         pygame.draw.circle(surface, KNOB_COLOR, (int(knob_x), self.rect.centery), 10)
 
 class Button:
-    def __init__(self, x, y, w, h, text, callback):
+    def __init__(self, x, y, w, h, text, callback, text_fn=None):
         self.rect = pygame.Rect(x, y, w, h)
         self.text = text
+        self.text_fn = text_fn
         self.callback = callback
         self.hovered = False
+        self.text_cache = {}
+
+    def contains(self, pos):
+        return self.rect.collidepoint(pos)
 
     def handle_event(self, event):
-        if event.type == pygame.MOUSEMOTION:
-            self.hovered = self.rect.collidepoint(event.pos)
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            if self.hovered and event.button == 1:
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if event.button == 1 and self.contains(event.pos):
                 self.callback()
 
+    def render_text(self, font, text):
+        if text not in self.text_cache:
+            self.text_cache[text] = font.render(text, True, TEXT_COLOR)
+        return self.text_cache[text]
+
     def draw(self, surface, font):
         color = (100, 100, 100) if not self.hovered else (150, 150, 150)
         pygame.draw.rect(surface, color, self.rect)
         pygame.draw.rect(surface, (200, 200, 200), self.rect, 2)
         
-        text_surf = font.render(self.text, True, TEXT_COLOR)
+        text = self.text_fn() if self.text_fn else self.text
+        text_surf = self.render_text(font, text)
         text_rect = text_surf.get_rect(center=self.rect.center)
         surface.blit(text_surf, text_rect)
 
@@ -214,10 +299,8 @@ class ToggleButton(Button):
         self.setter = setter
 
     def handle_event(self, event):
-        if event.type == pygame.MOUSEMOTION:
-            self.hovered = self.rect.collidepoint(event.pos)
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            if self.hovered and event.button == 1:
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if event.button == 1 and self.contains(event.pos):
                 self.setter(not self.getter())
 
     def draw(self, surface, font):
@@ -230,7 +313,7 @@ class ToggleButton(Button):
         pygame.draw.rect(surface, (200, 200, 200), self.rect, 2)
         
         status = "ON" if is_active else "OFF"
-        text_surf = font.render(f"{self.text}: {status}", True, TEXT_COLOR)
+        text_surf = self.render_text(font, f"{self.text}: {status}")
         text_rect = text_surf.get_rect(center=self.rect.center)
         surface.blit(text_surf, text_rect)
 
@@ -240,223 +323,466 @@ class Obstacle:
         self.y = y
         self.radius = radius
         self.dragging = False
+        self.sprite = None
+        self.sprite_radius = None
+
+    def get_sprite(self):
+        if self.sprite_radius != self.radius:
+            size = 2 * self.radius + 4
+            center = (self.radius + 2, self.radius + 2)
+            self.sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+            pygame.draw.circle(self.sprite, OBSTACLE_COLOR, center, self.radius)
+            pygame.draw.circle(self.sprite, (200, 200, 250), center, self.radius, 2)
+            self.sprite_radius = self.radius
+        return self.sprite
 
     def draw(self, surface):
-        pygame.draw.circle(surface, OBSTACLE_COLOR, (int(self.x), int(self.y)), self.radius)
-        pygame.draw.circle(surface, (200, 200, 250), (int(self.x), int(self.y)), self.radius, 2)
+        offset = self.radius + 2
+        surface.blit(self.get_sprite(), (int(self.x) - offset, int(self.y) - offset))
+
+    def contains(self, pos):
+        return math.hypot(pos[0] - self.x, pos[1] - self.y) < self.radius
 
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN:
-            if event.button == 1:
-                dist = math.hypot(event.pos[0] - self.x, event.pos[1] - self.y)
-                if dist < self.radius:
-                    self.dragging = True
+            if event.button == 1 and self.contains(event.pos):
+                self.dragging = True
         elif event.type == pygame.MOUSEBUTTONUP:
             self.dragging = False
         elif event.type == pygame.MOUSEMOTION:
             if self.dragging:
                 self.x, self.y = event.pos
 
-class Particle:
-    __slots__ = ('x', 'y', 'vx', 'vy', 'ax', 'ay', 'life', 'decay', 'radius', 'growth', 'density', 'pressure')
-
-    def __init__(self, x, y):
-        self.reset(x, y)
-
-    def apply_force(self, fx, fy):
-        self.ax += fx
-        self.ay += fy
+@njit("UniTuple(float32, 2)(float32, float32, float32[:, ::1], float32[:, ::1], float32, float32, intp, intp)",
+      fastmath=True, cache=True)
+def sample_grid(x, y, gvx, gvy, inv_cell_w, inv_cell_h, rows, cols):
+    gx = min(max(x * inv_cell_w - 0.5, 0.0), cols - 1.0)
+    gy = min(max(y * inv_cell_h - 0.5, 0.0), rows - 1.0)
+    c = min(int(gx), cols - 2)
+    r = min(int(gy), rows - 2)
+    tx = gx - c
+    ty = gy - r
+
+    top_x = gvx[r, c] + (gvx[r, c + 1] - gvx[r, c]) * tx
+    bottom_x = gvx[r + 1, c] + (gvx[r + 1, c + 1] - gvx[r + 1, c]) * tx
+    top_y = gvy[r, c] + (gvy[r, c + 1] - gvy[r, c]) * tx
+    bottom_y = gvy[r + 1, c] + (gvy[r + 1, c + 1] - gvy[r + 1, c]) * tx
+
+    return top_x + (bottom_x - top_x) * ty, top_y + (bottom_y - top_y) * ty
+
+@njit("void(float32[::1], float32[::1], float32[::1], float32[::1], float32[::1], float32[::1], "
+      "float32[::1], float32[::1], float32[::1], float32, "
+      "float32[:, ::1], float32, float32, float32, float32, intp, "
+      "float32[:, ::1], float32[:, ::1], float32, float32, intp, intp)",
+      parallel=True, fastmath=True, cache=True)
+def step_particles(x, y, vx, vy, ax, ay, life, decay, radius, growth,
+                   obs, const_ay, wind, drag, turbulence, integrator,
+                   gvx, gvy, inv_cell_w, inv_cell_h, rows, cols):
+    for i in prange(x.size):
+        px = x[i]
+        py = y[i]
+        pvx = vx[i]
+        pvy = vy[i]
+
+        fx = ax[i] + wind
+        fy = ay[i] + const_ay
+
+        if turbulence > 0:
+            if integrator == RK4:
+                k1x, k1y = sample_grid(px, py, gvx, gvy, inv_cell_w, inv_cell_h, rows, cols)
+                k2x, k2y = sample_grid(px + pvx * 0.5, py + pvy * 0.5, gvx, gvy, inv_cell_w, inv_cell_h, rows, cols)
+                k4x, k4y = sample_grid(px + pvx, py + pvy, gvx, gvy, inv_cell_w, inv_cell_h, rows, cols)
+
+                # k3 samples the same midpoint as k2, so it is folded into k2's weight
+                fx += (k1x + 4*k2x + k4x) / 6.0 * turbulence
+                fy += (k1y + 4*k2y + k4y) / 6.0 * turbulence
+            elif integrator == MIDPOINT:
+                mid_x, mid_y = sample_grid(px + pvx * 0.5, py + pvy * 0.5, gvx, gvy, inv_cell_w, inv_cell_h, rows, cols)
+                fx += mid_x * turbulence
+                fy += mid_y * turbulence
+            else:
+                curl_x, curl_y = sample_grid(px, py, gvx, gvy, inv_cell_w, inv_cell_h, rows, cols)
+                fx += curl_x * turbulence
+                fy += curl_y * turbulence
 
-    def compute_density_pressure(self, spatial_hash):
-        self.density = 0.0
-        neighbors = spatial_hash.query(self.x, self.y, params.smoothing_radius)
-        
-        for neighbor in neighbors:
-            dx = self.x - neighbor.x
-            dy = self.y - neighbor.y
-            dist = math.sqrt(dx*dx + dy*dy)
-            
-            if dist < params.smoothing_radius:
-                q = 1.0 - (dist / params.smoothing_radius)
-                self.density += q * q
+        pvx = (pvx + fx) * drag
+        pvy = (pvy + fy) * drag
 
-        self.density = max(self.density, 0.0001)
-        self.pressure = params.pressure_multiplier * max(0, self.density - params.target_density)
+        next_x = px + pvx
+        next_y = py + pvy
 
-    def compute_pressure_force(self, spatial_hash):
-        fx, fy = 0.0, 0.0
-        neighbors = spatial_hash.query(self.x, self.y, params.smoothing_radius)
-        
-        sr_sq = params.smoothing_radius * params.smoothing_radius
-        
-        for neighbor in neighbors:
-            if neighbor == self: continue
-            
-            dx = self.x - neighbor.x
-            dy = self.y - neighbor.y
+        for k in range(obs.shape[0]):
+            dx = next_x - obs[k, 0]
+            dy = next_y - obs[k, 1]
             dist_sq = dx*dx + dy*dy
-            
-            if 0 < dist_sq < sr_sq:
-                dist = math.sqrt(dist_sq)
-                q = 1.0 - (dist / params.smoothing_radius)
-                
-                press_term = (self.pressure + neighbor.pressure) / (2 * neighbor.density)
-                force = -press_term * q
-                
-                fx += (dx / dist) * force
-                fy += (dy / dist) * force
-        
-        max_force = 0.5
-        force_sq = fx*fx + fy*fy
-        if force_sq > max_force*max_force:
-            force_mag = math.sqrt(force_sq)
-            scale = max_force / force_mag
-            fx *= scale
-            fy *= scale
-            
-        self.apply_force(fx, fy)
 
-    def update(self, obstacles, vector_grid):
-        self.apply_force(0, params.gravity)
-        self.apply_force(0, -params.buoyancy)
+            min_dist = obs[k, 2] + radius[i] * 0.5
 
-        wind_variation = random.uniform(-0.005, 0.005)
-        self.apply_force(params.wind + wind_variation, 0)
-        
-        if params.turbulence_strength > 0:
-            if params.use_rk4:
-                dt = 1.0 
-                dt_time = 0.01 
-                
-                k1x, k1y = vector_grid.get_force(self.x, self.y, params.time)
-                
-                k2x, k2y = vector_grid.get_force(
-                    self.x + self.vx * 0.5 * dt, 
-                    self.y + self.vy * 0.5 * dt, 
-                    params.time + 0.5 * dt_time
-                )
-                
-                k3x, k3y = vector_grid.get_force(
-                    self.x + self.vx * 0.5 * dt, 
-                    self.y + self.vy * 0.5 * dt, 
-                    params.time + 0.5 * dt_time
-                )
-                
-                k4x, k4y = vector_grid.get_force(
-                    self.x + self.vx * dt, 
-                    self.y + self.vy * dt, 
-                    params.time + dt_time
-                )
-                
-                avg_fx = (k1x + 2*k2x + 2*k3x + k4x) / 6.0
-                avg_fy = (k1y + 2*k2y + 2*k3y + k4y) / 6.0
-                
-                self.apply_force(avg_fx * params.turbulence_strength, avg_fy * params.turbulence_strength)
-                
-            else:
-                curl_x, curl_y = vector_grid.get_force(self.x, self.y, params.time)
-                self.apply_force(curl_x * params.turbulence_strength, curl_y * params.turbulence_strength)
-        
-        self.vx += self.ax
-        self.vy += self.ay
-        self.vx *= params.drag
-        self.vy *= params.drag
-        
-        next_x = self.x + self.vx
-        next_y = self.y + self.vy
-
-        for obs in obstacles:
-            dx = next_x - obs.x
-            dy = next_y - obs.y
-            dist = math.hypot(dx, dy)
-            
-            min_dist = obs.radius + self.radius * 0.5 
-            
-            if dist < min_dist:
+            if dist_sq < min_dist*min_dist:
+                dist = max(math.sqrt(dist_sq), 1e-6)
                 nx = dx / dist
                 ny = dy / dist
-                
+
                 overlap = min_dist - dist
                 next_x += nx * overlap
                 next_y += ny * overlap
-                
-                dot = self.vx * nx + self.vy * ny
-                self.vx -= 2 * dot * nx
-                self.vy -= 2 * dot * ny
-                
-                self.vx *= 0.5
-                self.vy *= 0.5
-
-        self.x = next_x
-        self.y = next_y
-        
-        self.ax = 0
-        self.ay = 0
-        self.life -= self.decay
-        self.radius += self.growth
 
-    sprite_cache = {}
+                dot = pvx * nx + pvy * ny
+                pvx = (pvx - 2 * dot * nx) * 0.5
+                pvy = (pvy - 2 * dot * ny) * 0.5
+
+        x[i] = next_x
+        y[i] = next_y
+        vx[i] = pvx
+        vy[i] = pvy
+        ax[i] = 0
+        ay[i] = 0
+        life[i] -= decay[i]
+        radius[i] += growth
+
+@njit("void(float32[::1], float32[::1], float32[::1], float32[::1], int32[::1], int32[::1], "
+      "intp, intp, float32, float32, float32, float32)",
+      parallel=True, fastmath=True, cache=True)
+def sph_density_pressure(x, y, density, pressure, cell_start, particle_ids, rows, cols, cell_size,
+                         smoothing_radius, target_density, pressure_multiplier):
+    sr_sq = smoothing_radius * smoothing_radius
+    inv_sr = 1.0 / smoothing_radius
+
+    for i in prange(x.size):
+        xi = x[i]
+        yi = y[i]
+        cx = int(xi / cell_size)
+        cy = int(yi / cell_size)
+        d = 0.0
+
+        for r in range(max(cy - 1, 0), min(cy + 2, rows)):
+            for c in range(max(cx - 1, 0), min(cx + 2, cols)):
+                cell = r * cols + c
+                for k in range(cell_start[cell], cell_start[cell + 1]):
+                    j = particle_ids[k]
+                    dx = xi - x[j]
+                    dy = yi - y[j]
+                    dist_sq = dx*dx + dy*dy
+
+                    if dist_sq < sr_sq:
+                        q = 1.0 - math.sqrt(dist_sq) * inv_sr
+                        d += q * q
+
+        d = max(d, 0.0001)
+        density[i] = d
+        pressure[i] = pressure_multiplier * max(0.0, d - target_density)
+
+@njit("void(float32[::1], float32[::1], float32[::1], float32[::1], float32[::1], float32[::1], "
+      "int32[::1], int32[::1], intp, intp, float32, float32)",
+      parallel=True, fastmath=True, cache=True)
+def sph_pressure_force(x, y, density, pressure, ax, ay, cell_start, particle_ids, rows, cols, cell_size,
+                       smoothing_radius):
+    sr_sq = smoothing_radius * smoothing_radius
+    inv_sr = 1.0 / smoothing_radius
+    max_force = 0.5
+
+    for i in prange(x.size):
+        xi = x[i]
+        yi = y[i]
+        pi = pressure[i]
+        cx = int(xi / cell_size)
+        cy = int(yi / cell_size)
+        fx = 0.0
+        fy = 0.0
+
+        for r in range(max(cy - 1, 0), min(cy + 2, rows)):
+            for c in range(max(cx - 1, 0), min(cx + 2, cols)):
+                cell = r * cols + c
+                for k in range(cell_start[cell], cell_start[cell + 1]):
+                    j = particle_ids[k]
+                    dx = xi - x[j]
+                    dy = yi - y[j]
+                    dist_sq = dx*dx + dy*dy
+
+                    if 0 < dist_sq < sr_sq:
+                        dist = math.sqrt(dist_sq)
+                        q = 1.0 - dist * inv_sr
+
+                        press_term = (pi + pressure[j]) / (2 * density[j])
+                        force = -press_term * q / dist
+
+                        fx += dx * force
+                        fy += dy * force
 
-    def draw(self, surface):
-        if self.life <= 0: return
-        
-        radius_int = int(self.radius)
-        if radius_int < 1: return
-        
-        alpha = int(max(0, min(255, self.life)))
-        if alpha < 5: return
+        force_sq = fx*fx + fy*fy
+        if force_sq > max_force*max_force:
+            scale = max_force / math.sqrt(force_sq)
+            fx *= scale
+            fy *= scale
 
-        cache_key = (radius_int, alpha)
-        if cache_key not in Particle.sprite_cache:
-            temp_surface = pygame.Surface((radius_int * 2, radius_int * 2), pygame.SRCALPHA)
-            color = (*SMOKE_COLOR, alpha)
-            pygame.draw.circle(temp_surface, color, (radius_int, radius_int), radius_int)
-            Particle.sprite_cache[cache_key] = temp_surface
-        
-        texture = Particle.sprite_cache[cache_key]
-        surface.blit(texture, (int(self.x - radius_int), int(self.y - radius_int)))
+        ax[i] += fx
+        ay[i] += fy
+
+def rk4_turbulence(x, y, vx, vy, vector_grid, dt=1.0):
+    n = x.size
+    xs = np.concatenate((x, x + vx * (0.5 * dt), x + vx * dt))
+    ys = np.concatenate((y, y + vy * (0.5 * dt), y + vy * dt))
+    kx, ky = vector_grid.get_forces(xs, ys)
+    kx = kx.reshape(3, n)
+    ky = ky.reshape(3, n)
+
+    # k3 samples the same midpoint as k2, so it is folded into k2's weight
+    return (kx[0] + 4*kx[1] + kx[2]) / 6.0, (ky[0] + 4*ky[1] + ky[2]) / 6.0
+
+class Particles:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.count = 0
+        self.growth = 0.05
+        self.rng = np.random.default_rng()
+
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.ax = np.zeros(capacity, dtype=np.float32)
+        self.ay = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.decay = np.zeros(capacity, dtype=np.float32)
+        self.radius = np.zeros(capacity, dtype=np.float32)
+        self.density = np.zeros(capacity, dtype=np.float32)
+        self.pressure = np.zeros(capacity, dtype=np.float32)
+
+        self._arrays = (self.x, self.y, self.vx, self.vy, self.ax, self.ay,
+                        self.life, self.decay, self.radius, self.density, self.pressure)
+
+    def emit(self, k, x, y):
+        k = min(k, self.capacity)
+        if k <= 0: return
+
+        overflow = self.count + k - self.capacity
+        if overflow > 0:
+            faded = np.argpartition(self.life[:self.count], overflow - 1)[:overflow]
+            self.life[faded] = 0
+            self.remove_dead()
+
+        i = self.count
+        j = i + k
+
+        u = self.rng.random((8, k), dtype=np.float32)
+        angle = u[0] * (2 * math.pi)
+        speed = 0.5 + u[1]
+
+        self.x[i:j] = x + (u[2] * 20 - 10)
+        self.y[i:j] = y + (u[3] * 20 - 10)
+        self.vx[i:j] = np.cos(angle) * speed + (u[4] - 0.5)
+        self.vy[i:j] = np.sin(angle) * speed - 1.0 + (u[5] - 0.5)
+        self.ax[i:j] = 0
+        self.ay[i:j] = 0
+        self.life[i:j] = 255.0
 
-    def reset(self, x, y):
-        self.x = x
-        self.y = y
-        angle = random.uniform(0, 2 * math.pi)
-        speed = random.uniform(0.5, 1.5)
-        self.vx = math.cos(angle) * speed
-        self.vy = math.sin(angle) * speed - 1.0
-        self.ax = 0
-        self.ay = 0
-        self.life = 255.0
-        
         lifetime_frames = params.particle_lifetime * FPS
         base_decay = 255.0 / max(1, lifetime_frames)
-        self.decay = random.uniform(base_decay * 0.8, base_decay * 1.2)
-        
-        self.radius = random.uniform(params.particle_size, params.particle_size * 1.5)
-        self.growth = 0.05
-        self.density = 0.0
-        self.pressure = 0.0
+        self.decay[i:j] = base_decay * (0.8 + 0.4 * u[6])
+
+        self.radius[i:j] = params.particle_size * (1.0 + 0.5 * u[7])
+        self.density[i:j] = 0
+        self.pressure[i:j] = 0
+
+        self.count = j
+
+    def compute_sph(self, spatial_hash):
+        n = self.count
+        if HAVE_NUMBA:
+            x, y = self.x[:n], self.y[:n]
+            density, pressure = self.density[:n], self.pressure[:n]
+            grid = (spatial_hash.cell_start, spatial_hash.particle_ids,
+                    spatial_hash.rows, spatial_hash.cols, spatial_hash.cell_size)
+            sph_density_pressure(x, y, density, pressure, *grid,
+                                 params.smoothing_radius, params.target_density, params.pressure_multiplier)
+            sph_pressure_force(x, y, density, pressure, self.ax[:n], self.ay[:n], *grid,
+                               params.smoothing_radius)
+        else:
+            self.compute_sph_python(spatial_hash)
+
+    def compute_sph_python(self, spatial_hash):
+        n = self.count
+        xs = self.x[:n].tolist()
+        ys = self.y[:n].tolist()
+        sr = params.smoothing_radius
+        sr_sq = sr * sr
+        inv_sr = 1.0 / sr
+        sqrt = math.sqrt
+        max_force = 0.5
+        densities = []
+        pairs = []
+
+        # one neighbour query per particle; the force pass reuses the pairs found here
+        for i in range(n):
+            xi, yi = xs[i], ys[i]
+            density = 0.0
+            near = []
+            for j in spatial_hash.query(xi, yi, sr, xs, ys):
+                dx = xi - xs[j]
+                dy = yi - ys[j]
+                dist_sq = dx*dx + dy*dy
+
+                if dist_sq < sr_sq:
+                    dist = sqrt(dist_sq)
+                    q = 1.0 - dist * inv_sr
+                    density += q * q
+                    if dist > 0:
+                        near.append((j, dx, dy, q / dist))
+
+            densities.append(max(density, 0.0001))
+            pairs.append(near)
+
+        density = self.density[:n]
+        density[:] = densities
+        self.pressure[:n] = params.pressure_multiplier * np.maximum(0, density - params.target_density)
+
+        pressure = self.pressure[:n].tolist()
+        density = density.tolist()
+
+        for i in range(n):
+            pi = pressure[i]
+            fx, fy = 0.0, 0.0
+
+            for j, dx, dy, q_over_dist in pairs[i]:
+                force = -(pi + pressure[j]) / (2 * density[j]) * q_over_dist
+                fx += dx * force
+                fy += dy * force
+
+            force_sq = fx*fx + fy*fy
+            if force_sq > max_force*max_force:
+                scale = max_force / math.sqrt(force_sq)
+                fx *= scale
+                fy *= scale
+
+            self.ax[i] += fx
+            self.ay[i] += fy
+
+    def update(self, obstacles, vector_grid, const_ay, wind, drag, turbulence, integrator):
+        n = self.count
+        if n == 0: return
+
+        obs = np.array([(o.x, o.y, o.radius) for o in obstacles], dtype=np.float32).reshape(-1, 3)
+
+        wind += (self.rng.random() - 0.5) * 0.01
+
+        if HAVE_NUMBA:
+            step_particles(self.x[:n], self.y[:n], self.vx[:n], self.vy[:n], self.ax[:n], self.ay[:n],
+                           self.life[:n], self.decay[:n], self.radius[:n], self.growth,
+                           obs, const_ay, wind, drag, turbulence, integrator,
+                           vector_grid.field_vx, vector_grid.field_vy,
+                           vector_grid.inv_field_step, vector_grid.inv_field_step,
+                           vector_grid.field_rows, vector_grid.field_cols)
+        else:
+            self.update_numpy(obs, vector_grid, const_ay, wind, drag, turbulence, integrator)
+
+    def update_numpy(self, obs, vector_grid, const_ay, wind, drag, turbulence, integrator):
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        vx, vy = self.vx[:n], self.vy[:n]
+        ax, ay = self.ax[:n], self.ay[:n]
+        radius = self.radius[:n]
+
+        ax += wind
+        ay += const_ay
+
+        if turbulence > 0:
+            if integrator == RK4:
+                turb_x, turb_y = rk4_turbulence(x, y, vx, vy, vector_grid)
+            elif integrator == MIDPOINT:
+                turb_x, turb_y = vector_grid.get_forces(x + vx * 0.5, y + vy * 0.5)
+            else:
+                turb_x, turb_y = vector_grid.get_forces(x, y)
+            ax += turb_x * turbulence
+            ay += turb_y * turbulence
 
-    def is_dead(self):
-        return self.life <= 0
+        vx += ax
+        vy += ay
+        vx *= drag
+        vy *= drag
 
-class ParticlePool:
-    def __init__(self, size):
-        self.pool = [Particle(0, 0) for _ in range(size)]
-        self.active_particles = []
+        next_x = x + vx
+        next_y = y + vy
 
-    def get(self, x, y):
-        if not self.pool:
-            return None
-        
-        p = self.pool.pop()
-        p.reset(x, y)
-        self.active_particles.append(p)
-        return p
+        if len(obs):
+            dx = next_x[:, None] - obs[None, :, 0]
+            dy = next_y[:, None] - obs[None, :, 1]
+            dist_sq = dx*dx + dy*dy
+
+            min_dist = obs[None, :, 2] + radius[:, None] * 0.5
+            masked = np.where(dist_sq < min_dist*min_dist, dist_sq, np.inf)
+            cols = np.argmin(masked, axis=1)[:, None]
+            hit = np.isfinite(np.take_along_axis(masked, cols, axis=1)[:, 0])
+
+            d = np.maximum(np.sqrt(np.take_along_axis(dist_sq, cols, axis=1)[:, 0]), 1e-6)
+            nx = np.take_along_axis(dx, cols, axis=1)[:, 0] / d
+            ny = np.take_along_axis(dy, cols, axis=1)[:, 0] / d
+
+            overlap = np.where(hit, np.take_along_axis(min_dist, cols, axis=1)[:, 0] - d, 0)
+            next_x += nx * overlap
+            next_y += ny * overlap
+
+            dot = vx * nx + vy * ny
+            vx[:] = np.where(hit, (vx - 2 * dot * nx) * 0.5, vx)
+            vy[:] = np.where(hit, (vy - 2 * dot * ny) * 0.5, vy)
+
+        x[:] = next_x
+        y[:] = next_y
+
+        ax[:] = 0
+        ay[:] = 0
+        self.life[:n] -= self.decay[:n]
+        radius += self.growth
 
-    def return_particle(self, p):
-        if p in self.active_particles:
-            self.active_particles.remove(p)
-            self.pool.append(p)
+    def remove_dead(self):
+        n = self.count
+        alive = self.life[:n] >= MIN_VISIBLE_LIFE
+        m = int(np.count_nonzero(alive))
+        if m == n: return
+
+        holes = np.flatnonzero(~alive[:m])
+        movers = np.flatnonzero(alive[m:]) + m
+
+        for arr in self._arrays:
+            arr[holes] = arr[movers]
+        self.count = m
+
+    circle_cache = {}
+
+    def get_circle(self, radius_int):
+        if radius_int not in Particles.circle_cache:
+            temp_surface = pygame.Surface((radius_int * 2, radius_int * 2), pygame.SRCALPHA)
+            pygame.draw.circle(temp_surface, (*SMOKE_COLOR, 255), (radius_int, radius_int), radius_int)
+            Particles.circle_cache[radius_int] = temp_surface
+        return Particles.circle_cache[radius_int]
+
+    def draw(self, surface):
+        n = self.count
+        if n == 0: return
+
+        radius_int = self.radius[:n].astype(np.intp)
+        alpha_bucket = np.minimum(self.life[:n], 255).astype(np.intp) // ALPHA_STEP
+        key = radius_int * ALPHA_BUCKETS + alpha_bucket
+
+        x, y = self.x[:n], self.y[:n]
+        visible = np.flatnonzero((radius_int >= 1) &
+                                 (x + radius_int > 0) & (x - radius_int < WIDTH) &
+                                 (y + radius_int > 0) & (y - radius_int < HEIGHT))
+        order = visible[np.argsort(key[visible], kind="stable")]
+        keys = key[order]
+        xs = (self.x[order] - radius_int[order]).astype(np.intp).tolist()
+        ys = (self.y[order] - radius_int[order]).astype(np.intp).tolist()
+
+        bounds = [0, *(np.flatnonzero(np.diff(keys)) + 1).tolist(), len(keys)]
+        if hasattr(surface, "fblits"):
+            blit = surface.fblits
+        else:
+            blit = lambda seq: surface.blits(seq, doreturn=False)
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            if start == end: continue
+            k = int(keys[start])
+            texture = self.get_circle(k // ALPHA_BUCKETS)
+            texture.set_alpha(min(255, (k % ALPHA_BUCKETS) * ALPHA_STEP + ALPHA_STEP // 2))
+            blit([(texture, pos) for pos in zip(xs[start:end], ys[start:end])])
 
 def main():
     pygame.init()
@@ -464,9 +790,9 @@ def main():
     pygame.display.set_caption("Smoke Physics Engine - Curl Noise")
     clock = pygame.time.Clock()
     font = pygame.font.SysFont("Arial", 16)
+    hint_text = font.render("Drag obstacles", True, TEXT_COLOR)
 
-    particle_pool = ParticlePool(200)
-    particles = particle_pool.active_particles
+    particles = Particles(MAX_PARTICLES)
     
     obstacles = [
         Obstacle(WIDTH // 2 + 150, HEIGHT // 2, 60),
@@ -474,7 +800,7 @@ def main():
     ]
 
     vector_grid = VectorGrid(20, 20, WIDTH, HEIGHT)
-    spatial_hash = FixedGrid(WIDTH, HEIGHT, params.smoothing_radius)
+    spatial_hash = FixedGrid(WIDTH, HEIGHT, snap_cell_size(params.smoothing_radius))
 
     sliders = [
         Slider(50, 50, 200, 10, 1.0, 10.0, params.particle_size, "Initial Size"),
@@ -493,37 +819,49 @@ def main():
     buttons = [
         ToggleButton(50, 460, 200, 30, "Show Vector Grid", lambda: params.show_grid, lambda x: setattr(params, 'show_grid', x)),
         ToggleButton(50, 500, 200, 30, "Show Spatial Grid", lambda: params.show_spatial_grid, lambda x: setattr(params, 'show_spatial_grid', x)),
-        ToggleButton(50, 540, 200, 30, "Integrator: RK4", lambda: params.use_rk4, lambda x: setattr(params, 'use_rk4', x))
+        Button(50, 540, 200, 30, "Integrator",
+               lambda: setattr(params, 'integrator', (params.integrator + 1) % len(INTEGRATOR_NAMES)),
+               lambda: f"Integrator: {INTEGRATOR_NAMES[params.integrator]}")
     ]
 
+    mouse_widgets = sliders + buttons + obstacles
+    active_drags = []
+
     running = True
     while running:
-        clock.tick(FPS)
+        frame_ms = clock.tick(FPS)
         screen.fill(BACKGROUND_COLOR)
         pygame.draw.rect(screen, UI_BG_COLOR, (0, 0, 300, HEIGHT))
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
-            
-            for slider in sliders:
-                slider.handle_event(event)
-            
-            for btn in buttons:
-                btn.handle_event(event)
-                if btn.text.startswith("Integrator"):
-                    btn.text = f"Integrator: {'RK4' if params.use_rk4 else 'Euler'}"
-                elif btn.text.startswith("Show Spatial"):
-                    pass
-            
-            for obs in obstacles:
-                obs.handle_event(event)
+
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                for widget in mouse_widgets:
+                    if widget.contains(event.pos):
+                        widget.handle_event(event)
+                        if getattr(widget, "dragging", False):
+                            active_drags.append(widget)
+                        break
+
+            elif event.type == pygame.MOUSEMOTION:
+                for widget in active_drags:
+                    widget.handle_event(event)
+
+            elif event.type == pygame.MOUSEBUTTONUP:
+                for widget in active_drags:
+                    widget.handle_event(event)
+                active_drags.clear()
             
             if event.type == pygame.KEYDOWN:
                 pass
 
+        mouse_pos = pygame.mouse.get_pos()
+        for btn in buttons:
+            btn.hovered = btn.contains(mouse_pos)
+
         params.time += 0.01
-        vector_grid.update(params.time)
 
         params.particle_size = sliders[0].val
         params.buoyancy = sliders[1].val
@@ -536,11 +874,14 @@ def main():
         params.smoothing_radius = sliders[6].val
         params.target_density = sliders[7].val
         params.pressure_multiplier = sliders[8].val
+
+        if params.turbulence_strength > 0 or params.show_grid:
+            vector_grid.update(params.time)
         
-        if abs(spatial_hash.cell_size - params.smoothing_radius) > 1.0:
-             spatial_hash = FixedGrid(WIDTH, HEIGHT, params.smoothing_radius)
+        cell_size = snap_cell_size(params.smoothing_radius)
+        if cell_size != spatial_hash.cell_size:
+            spatial_hash.resize(cell_size)
 
-        mouse_pos = pygame.mouse.get_pos()
         should_emit = False
         emit_pos = (WIDTH // 2 + 150, HEIGHT - 50)
 
@@ -554,30 +895,24 @@ def main():
             should_emit = True
         
         if should_emit:
-            for _ in range(params.emission_rate):
-                px = emit_pos[0] + random.uniform(-10, 10)
-                py = emit_pos[1] + random.uniform(-10, 10)
-                p = particle_pool.get(px, py)
-                if p:
-                    p.vx += random.uniform(-0.5, 0.5)
-                    p.vy += random.uniform(-0.5, 0.5)
-
-        spatial_hash.clear()
-        for p in particles:
-            spatial_hash.insert(p)
-            
-        for p in particles:
-            p.compute_density_pressure(spatial_hash)
-            
-        for p in particles:
-            p.compute_pressure_force(spatial_hash)
+            emit_count = params.emission_rate
+            if frame_ms > THROTTLE_FRAME_MS:
+                emit_count = max(1, int(emit_count * (1000 / FPS) / frame_ms))
+            particles.emit(emit_count, emit_pos[0], emit_pos[1])
+
+        n = particles.count
+        if params.pressure_multiplier > 0 or params.show_spatial_grid:
+            spatial_hash.build(particles.x[:n], particles.y[:n])
+
+        if params.pressure_multiplier > 0:
+            particles.compute_sph(spatial_hash)
 
-        for i in range(len(particles) - 1, -1, -1):
-            p = particles[i]
-            p.update(obstacles, vector_grid)
-            p.draw(screen)
-            if p.is_dead():
-                particle_pool.return_particle(p)
+        const_ay = params.gravity - params.buoyancy
+        wind, drag = params.wind, params.drag
+        turbulence, integrator = params.turbulence_strength, params.integrator
+        particles.update(obstacles, vector_grid, const_ay, wind, drag, turbulence, integrator)
+        particles.remove_dead()
+        particles.draw(screen)
 
         for obs in obstacles:
             obs.draw(screen)
@@ -594,8 +929,7 @@ def main():
         for btn in buttons:
             btn.draw(screen, font)
             
-        info_text = font.render(f"Particles: {len(particles)} | FPS: {int(clock.get_fps())}", True, TEXT_COLOR)
-        hint_text = font.render("Drag obstacles", True, TEXT_COLOR)
+        info_text = font.render(f"Particles: {particles.count} | FPS: {int(clock.get_fps())}", True, TEXT_COLOR)
         screen.blit(info_text, (10, HEIGHT - 30))
         screen.blit(hint_text, (10, HEIGHT - 50))
 